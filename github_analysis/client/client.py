@@ -2,29 +2,196 @@
 
 import argparse
 import asyncio
-import json
+import functools
 import os
-from contextlib import AsyncExitStack
+import re
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import AsyncExitStack, asynccontextmanager
 from typing import Any
 
+import anyio
 import ollama
+import orjson
 import questionary
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
+from mcp.shared.memory import MessageStream, create_client_server_memory_streams
 from mcp.types import TextContent
 from rich.console import Console
+from rich.live import Live
+from rich.markdown import Markdown
+from rich.spinner import Spinner
+
+from github_analysis.server import serve
 
 console = Console()
 
+# How long tool results stay fresh in the per-client cache, in seconds
+REPO_INFO_TTL = 3600
+COMMITS_TTL = 300
+
+# Tool results kept per client before the least recently used is evicted
+CACHE_SIZE = 128
+
+OLLAMA_MODEL = "qwen2.5:7b"
+OLLAMA_OPTIONS = {"num_ctx": 4000}
+
+# Every chat starts with this system prompt, so Ollama can reuse its KV cache
+# instead of prefilling it each time. The repository name comes last so the
+# prose before it is an identical prefix across sessions as well.
+SYSTEM_PROMPT = """You are a GitHub repository analyzer.
+The user will ask you questions about a repository which they have no knowledge about.
+Answer questions about the repository to the best of your ability.
+The repository is {owner}/{repo}."""
+
+COMMIT_ANALYSIS_PROMPT = """Analyze the commit history of the repository.
+What insights can you provide about common themes, code areas modified, and notable changes?
+Please format your response in a clear, structured way."""
+
+REPO_ANALYSIS_PROMPT = """Analyze the repository's information and provide insights about:
+1. Repository size and activity level
+2. Main programming languages
+3. Notable features (stars, forks, etc.)
+Please format your response in a clear, structured, and concise way."""
+
+REPO_CONTEXT_PROMPT = """
+Use the metadata returned by the GitHub API and the raw README text to guide your response."""
+
+# Keywords that route a custom prompt to a tool; they match anywhere in a word
+_COMMIT_RE = re.compile(
+    r"commit|change|diff|modified|added|deleted|history|previous|version|update",
+    re.IGNORECASE,
+)
+_REPO_RE = re.compile(
+    r"repo|repository|project|codebase|structure|directory|files|organization",
+    re.IGNORECASE,
+)
+
+MENU_CHOICES = {
+    "commits": "🔄 Analyze recent commits",
+    "repo": "📊 Analyze repository information",
+    "all": "⚡ Analyze commits and repository together",
+    "custom": "🔍 Custom analysis prompt",
+    "exit": "👋 Exit",
+}
+_MENU_KEYS = {label: key for key, label in MENU_CHOICES.items()}
+
+MENU_STYLE = questionary.Style(
+    [
+        ("qmark", "fg:ansigreen bold"),
+        ("question", "bold"),
+        ("answer", "fg:ansiblue bold"),
+        ("pointer", "fg:ansiyellow bold"),
+        ("highlighted", "fg:ansiyellow bold"),
+        ("selected", "fg:ansigreen"),
+    ]
+)
+
+
+@functools.cache
+def _stdio_server_params() -> StdioServerParameters:
+    """Build the parameters for running the server as a child process.
+
+    The script path and environment are fixed for the life of the process, so
+    they are built once and reused on reconnects.
+    """
+    # Get the server script path
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    server_script = os.path.join(os.path.dirname(current_dir), "server", "server.py")
+
+    if not os.path.exists(server_script):
+        raise FileNotFoundError(f"Server script not found at {server_script}")
+
+    # Set up environment variables
+    env = {
+        **os.environ,
+        "PYTHONUNBUFFERED": "1",
+        "PYTHONPATH": os.path.dirname(os.path.dirname(current_dir)),
+    }
+
+    return StdioServerParameters(command="python", args=[server_script], env=env)
+
+
+@asynccontextmanager
+async def serve_in_process() -> AsyncIterator[MessageStream]:
+    """Run the MCP server as a task in this event loop.
+
+    Yields the client's read and write streams. The server is cancelled when
+    the context exits.
+    """
+    async with create_client_server_memory_streams() as (
+        client_streams,
+        server_streams,
+    ):
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(serve, *server_streams)
+            try:
+                yield client_streams
+            finally:
+                tg.cancel_scope.cancel()
+
 
 class GitHubAnalysisClient:
     """Client for GitHub repository analysis."""
 
-    def __init__(self, disable_tools: bool = False) -> None:
+    def __init__(
+        self, disable_tools: bool = False, out_of_process: bool = False
+    ) -> None:
         """Initialize the client."""
         self.session: ClientSession | None = None
         self.exit_stack = AsyncExitStack()
         self.disable_tools = disable_tools
+        self.out_of_process = out_of_process
+        self.ollama_client = ollama.AsyncClient()
+        self._warm_up_task: asyncio.Task[None] | None = None
+        self._connected = False
+        self._connect_lock = asyncio.Lock()
+        self._cache: OrderedDict[tuple[Any, ...], tuple[float, Any]] = OrderedDict()
+        self._cache_locks: dict[tuple[Any, ...], asyncio.Lock] = {}
+
+    async def connect(self) -> None:
+        """Start the MCP server and initialize a session, once per client.
+
+        The server runs as a task in this event loop and talks to the session
+        over in-memory streams, unless out_of_process is set, in which case it
+        is started as a child process speaking MCP over stdio. Safe to call
+        repeatedly: later calls reuse the running server.
+        """
+        async with self._connect_lock:
+            if self._connected:
+                return
+
+            try:
+                # Set up the transport and session
+                if self.out_of_process:
+                    transport = await self.exit_stack.enter_async_context(
+                        stdio_client(_stdio_server_params())
+                    )
+                else:
+                    transport = await self.exit_stack.enter_async_context(
+                        serve_in_process()
+                    )
+                self.session = await self.exit_stack.enter_async_context(
+                    ClientSession(*transport)
+                )
+
+                # Initialize the session
+                await self.session.initialize()
+            except Exception:
+                # Don't leave a half-started server behind
+                await self.disconnect()
+                raise
+
+            self._connected = True
+
+    async def disconnect(self) -> None:
+        """Close the MCP session and stop the server."""
+        await self.exit_stack.aclose()
+        self.exit_stack = AsyncExitStack()
+        self.session = None
+        self._connected = False
 
     async def connect_to_server(self) -> None:
         """Connect to the MCP server and list available tools."""
@@ -34,268 +201,333 @@ class GitHubAnalysisClient:
             )
             return
 
+        if self._connected:
+            return
+
         try:
             console.print("[bold green]🔌 Connecting to GitHub Analysis Server...[/]")
+            await self.connect()
+        except Exception as e:
+            console.print(f"\n[bold red]❌ Failed to connect to server:[/] {e!s}")
+            raise
 
-            # Get the server script path
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            server_script = os.path.join(
-                os.path.dirname(current_dir), "server", "server.py"
-            )
-
-            if not os.path.exists(server_script):
-                raise FileNotFoundError(f"Server script not found at {server_script}")
-
-            # Set up environment variables
-            env = os.environ.copy()
-            env.update(
-                {
-                    "PYTHONUNBUFFERED": "1",
-                    "PYTHONPATH": os.path.dirname(os.path.dirname(current_dir)),
-                }
-            )
-
-            # Connect to the server
-            server_params = StdioServerParameters(
-                command="python", args=[server_script], env=env
-            )
-
-            # Set up the transport and session
-            transport = await self.exit_stack.enter_async_context(
-                stdio_client(server_params)
-            )
-            self.session = await self.exit_stack.enter_async_context(
-                ClientSession(*transport)
-            )
-
-            # Initialize the session
-            await self.session.initialize()
-
-            # List available tools
+        # Listing tools is informational; a failure here keeps the session
+        try:
+            if not self.session:
+                raise RuntimeError("Not connected to server")
             response = await self.session.list_tools()
             console.print("\n[bold cyan]Available tools:[/]")
             for tool in response.tools:
                 console.print(f"  • [bold]{tool.name}[/]: {tool.description}")
             console.print()
-
         except Exception as e:
-            console.print(f"\n[bold red]❌ Failed to connect to server:[/] {e!s}")
-            await self.exit_stack.aclose()
-            raise
-
-    async def get_repo_info(self, owner: str, repo: str) -> dict[str, Any] | None:
-        """Get repository information."""
-        if self.disable_tools:
-            return None
-
+            console.print(f"\n[bold yellow]⚠️  Could not list tools:[/] {e!s}")
+
+    async def _cached(
+        self,
+        key: tuple[Any, ...],
+        ttl: float,
+        coro_factory: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Return the cached result for key, or await coro_factory on a miss.
+
+        The cache is shared by every handler and bounded to CACHE_SIZE entries,
+        evicting the least recently used. Concurrent misses on the same key
+        share a lock so only one of them reaches the server. Failed (None)
+        results are not cached, and neither is their lock.
+        """
+        lock = self._cache_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self._cache.get(key)
+            if entry is not None and time.monotonic() - entry[0] < ttl:
+                self._cache.move_to_end(key)
+                return entry[1]
+
+            result = await coro_factory()
+            if result is not None:
+                self._cache[key] = (time.monotonic(), result)
+                self._cache.move_to_end(key)
+                if len(self._cache) > CACHE_SIZE:
+                    evicted, _ = self._cache.popitem(last=False)
+                    self._cache_locks.pop(evicted, None)
+            elif key not in self._cache and self._cache_locks.get(key) is lock:
+                # Nothing is stored for this key, so keep no lock for it either
+                del self._cache_locks[key]
+            return result
+
+    async def _call_tool(
+        self, name: str, arguments: dict[str, Any]
+    ) -> list[Any] | None:
+        """Call a server tool and decode the JSON of each text content item.
+
+        FastMCP sends a list result as one content item per element, and any
+        other result as a single item.
+        """
         try:
+            await self.connect()
             if not self.session:
                 raise RuntimeError("Not connected to server")
 
-            result = await self.session.call_tool(
-                "get_repo_info", arguments={"owner": owner, "repo": repo}
-            )
-            if isinstance(result.content, list) and result.content:
-                first_content = result.content[0]
-                if isinstance(first_content, TextContent):
-                    return json.loads(first_content.text)
-            return None
+            result = await self.session.call_tool(name, arguments=arguments)
+            texts = [
+                content.text
+                for content in result.content
+                if isinstance(content, TextContent)
+            ]
+            # A failed tool reports its error message as plain text
+            if result.isError:
+                raise RuntimeError(" ".join(texts))
+            return [orjson.loads(text) for text in texts]
         except Exception as e:
             console.print(f"\n[bold red]❌ Error:[/] {e!s}")
             return None
 
+    async def get_repo_info(self, owner: str, repo: str) -> dict[str, Any] | None:
+        """Get repository information."""
+        if self.disable_tools:
+            return None
+
+        contents = await self._cached(
+            ("get_repo_info", owner, repo),
+            REPO_INFO_TTL,
+            lambda: self._call_tool("get_repo_info", {"owner": owner, "repo": repo}),
+        )
+        return contents[0] if contents else None
+
     async def get_commits(
         self, owner: str, repo: str, limit: int = 5
-    ) -> dict[str, Any] | None:
+    ) -> list[dict[str, Any]] | None:
         """Get commit history."""
         if self.disable_tools:
             return None
 
-        try:
-            if not self.session:
-                raise RuntimeError("Not connected to server")
+        return await self._cached(
+            ("get_commit_history", owner, repo, limit),
+            COMMITS_TTL,
+            lambda: self._call_tool(
+                "get_commit_history", {"owner": owner, "repo": repo, "limit": limit}
+            ),
+        )
 
-            result = await self.session.call_tool(
-                "get_commit_history",
-                arguments={"owner": owner, "repo": repo, "limit": limit},
-            )
-            if isinstance(result.content, list) and result.content:
-                first_content = result.content[0]
-                if isinstance(first_content, TextContent):
-                    return json.loads(first_content.text)
-            return None
-        except Exception as e:
-            console.print(f"\n[bold red]❌ Error:[/] {e!s}")
-            return None
+    def _build_messages(
+        self, system_prompt: str, context="", user_prompt=""
+    ) -> list[dict[str, str]]:
+        """Build the chat messages for an Ollama request."""
+        messages = [{"role": "system", "content": system_prompt}]
+
+        if context:
+            messages.append({"role": "system", "content": context})
 
-    def analyze_with_ollama(
+        if user_prompt:
+            messages.append({"role": "user", "content": user_prompt})
+
+        return messages
+
+    async def chat_with_ollama(
         self, system_prompt: str, context="", user_prompt=""
     ) -> str:
-        """Use Ollama to analyze GitHub data."""
-        with console.status("[bold green]Analyzing with Ollama...", spinner="moon"):
-            messages = [{"role": "system", "content": system_prompt}]
+        """Use Ollama to analyze GitHub data and return the complete reply."""
+        response = await self.ollama_client.chat(
+            model=OLLAMA_MODEL,
+            messages=self._build_messages(system_prompt, context, user_prompt),
+            options=OLLAMA_OPTIONS,
+        )
+        return response["message"]["content"]
 
-            if context:
-                messages.append({"role": "system", "content": context})
+    async def analyze_with_ollama(
+        self, system_prompt: str, context="", user_prompt=""
+    ) -> str:
+        """Use Ollama to analyze GitHub data, rendering the reply as it streams."""
+        analysis = ""
+        spinner = Spinner("moon", text="[bold green]Analyzing with Ollama...")
+        with Live(spinner, console=console, vertical_overflow="visible") as live:
+            async for chunk in await self.ollama_client.chat(
+                model=OLLAMA_MODEL,
+                messages=self._build_messages(system_prompt, context, user_prompt),
+                options=OLLAMA_OPTIONS,
+                stream=True,
+            ):
+                analysis += chunk["message"]["content"]
+                live.update(Markdown(analysis))
+        return analysis
+
+    async def warm_up(self, owner: str, repo: str) -> None:
+        """Load the model and prefill the shared system prompt.
+
+        The first chat then neither waits for the model to load nor prefills
+        the system prompt, whose KV cache is reused by later requests.
+        """
+        try:
+            await self.ollama_client.chat(
+                model=OLLAMA_MODEL,
+                messages=self._build_messages(
+                    SYSTEM_PROMPT.format(owner=owner, repo=repo), user_prompt="."
+                ),
+                options={**OLLAMA_OPTIONS, "num_predict": 1},
+            )
+        except Exception:
+            # Warming up is best-effort; real requests still report errors
+            pass
 
-            if user_prompt:
-                messages.append({"role": "user", "content": user_prompt})
+    def start_warm_up(self, owner: str, repo: str) -> None:
+        """Run warm_up in the background unless it has already been started."""
+        if self._warm_up_task is None:
+            self._warm_up_task = asyncio.create_task(self.warm_up(owner, repo))
 
-            response = ollama.chat(
-                model="qwen2.5:7b", messages=messages, options={"num_ctx": 4000}
-            )
-            return response["message"]["content"]
+    async def _prepare_commit_analysis(
+        self, owner: str, repo: str
+    ) -> tuple[str, str, str] | None:
+        """Build the system prompt, context and prompt for a commit analysis.
 
-    async def handle_commit_analysis(self, owner: str, repo: str) -> None:
-        """Handle commit analysis workflow."""
-        system_prompt = f"""
-        Analyze the commit history of the GitHub repository {owner}/{repo}.
-        What insights can you provide about common themes, code areas modified, and notable changes?
-        Please format your response in a clear, structured way.
+        Returns None if the commit history could not be fetched.
         """
+        system_prompt = SYSTEM_PROMPT.format(owner=owner, repo=repo)
         if self.disable_tools:
-            analysis = self.analyze_with_ollama(system_prompt)
-            console.print("\n[bold cyan]📊 Analysis Results:[/]\n")
-            console.print(analysis)
-            return
+            return system_prompt, "", COMMIT_ANALYSIS_PROMPT
 
         commits = await self.get_commits(owner, repo)
         if not commits:
+            return None
+
+        context = orjson.dumps(commits).decode()
+        return system_prompt, context, COMMIT_ANALYSIS_PROMPT
+
+    async def _prepare_repo_analysis(
+        self, owner: str, repo: str
+    ) -> tuple[str, str, str] | None:
+        """Build the system prompt, context and prompt for a repository analysis.
+
+        Returns None if the repository information could not be fetched.
+        """
+        system_prompt = SYSTEM_PROMPT.format(owner=owner, repo=repo)
+        if self.disable_tools:
+            return system_prompt, "", REPO_ANALYSIS_PROMPT
+
+        repo_info = await self.get_repo_info(owner, repo)
+        if not repo_info:
+            return None
+
+        context = orjson.dumps(repo_info).decode()
+        return system_prompt, context, REPO_ANALYSIS_PROMPT + REPO_CONTEXT_PROMPT
+
+    async def handle_commit_analysis(self, owner: str, repo: str) -> None:
+        """Handle commit analysis workflow."""
+        prepared = await self._prepare_commit_analysis(owner, repo)
+        if prepared is None:
             return
 
-        context = json.dumps(commits, indent=2)
-        analysis = self.analyze_with_ollama(system_prompt, context)
-        console.print("\n[bold cyan]📊 Commit Analysis Results:[/]\n")
-        console.print(analysis)
+        title = "Analysis" if self.disable_tools else "Commit Analysis"
+        console.print(f"\n[bold cyan]📊 {title} Results:[/]\n")
+        await self.analyze_with_ollama(*prepared)
 
     async def handle_repo_analysis(self, owner: str, repo: str) -> None:
         """Handle repository analysis workflow."""
-        system_prompt = f"""
-        Analyze this GitHub repository {owner}/{repo}'s information and provide insights about:
-        1. Repository size and activity level
-        2. Main programming languages
-        3. Notable features (stars, forks, etc.)
-        Please format your response in a clear, structured, and concise way.
-        Note that your user have no idea what the repository is like.
-        """
-        if self.disable_tools:
-            analysis = self.analyze_with_ollama(system_prompt)
-            console.print("\n[bold cyan]📊 Analysis Results:[/]\n")
-            console.print(analysis)
+        prepared = await self._prepare_repo_analysis(owner, repo)
+        if prepared is None:
             return
 
-        system_prompt += """
-        Here are some metadata returned by the Github API as well as the README in raw text.
-        Use this to guide your response.
+        title = "Analysis" if self.disable_tools else "Repository Analysis"
+        console.print(f"\n[bold cyan]📊 {title} Results:[/]\n")
+        await self.analyze_with_ollama(*prepared)
+
+    async def handle_all_analysis(self, owner: str, repo: str) -> None:
+        """Handle commit and repository analysis as one concurrent batch.
+
+        Both chat requests are in flight at once, so an Ollama server that
+        allows parallel requests can batch them instead of running them back
+        to back.
         """
-        repo_info = await self.get_repo_info(owner, repo)
-        if not repo_info:
+        # Connect from this task before gather runs the fetches in child tasks
+        if not self.disable_tools:
+            await self.connect()
+
+        prepared = await asyncio.gather(
+            self._prepare_commit_analysis(owner, repo),
+            self._prepare_repo_analysis(owner, repo),
+        )
+        jobs = [
+            (title, job)
+            for title, job in zip(
+                ("Commit Analysis", "Repository Analysis"), prepared, strict=True
+            )
+            if job is not None
+        ]
+        if not jobs:
             return
 
-        context = json.dumps(repo_info, indent=2)
-        analysis = self.analyze_with_ollama(system_prompt, context)
-        console.print("\n[bold cyan]📊 Repository Analysis Results:[/]\n")
-        console.print(analysis)
+        with console.status("[bold green]Analyzing with Ollama...", spinner="moon"):
+            analyses = await asyncio.gather(
+                *(self.chat_with_ollama(*job) for _, job in jobs)
+            )
+
+        for (title, _), analysis in zip(jobs, analyses, strict=True):
+            console.print(f"\n[bold cyan]📊 {title} Results:[/]\n")
+            console.print(Markdown(analysis))
 
     def _needs_commit_info(self, prompt: str) -> bool:
         """Infer if commit information is needed based on the prompt."""
-        keywords = [
-            "commit",
-            "change",
-            "diff",
-            "modified",
-            "added",
-            "deleted",
-            "history",
-            "previous",
-            "version",
-            "update",
-        ]
-        return any(keyword in prompt.lower() for keyword in keywords)
+        return _COMMIT_RE.search(prompt) is not None
 
     def _needs_repo_info(self, prompt: str) -> bool:
         """Infer if repository information is needed based on the prompt."""
-        keywords = [
-            "repo",
-            "repository",
-            "project",
-            "codebase",
-            "structure",
-            "directory",
-            "files",
-            "organization",
-        ]
-        return any(keyword in prompt.lower() for keyword in keywords)
+        return _REPO_RE.search(prompt) is not None
 
     async def handle_custom_analysis(self, owner: str, repo: str) -> None:
         """Handle custom analysis workflow."""
-        system_prompt = f"""
-        You are a GitHub repository analyzer.
-        The user will ask you questions about the repository {owner}/{repo} which they have no knowledge about.
-        Answer questions about the repository to the best of your ability.
-        """
+        system_prompt = SYSTEM_PROMPT.format(owner=owner, repo=repo)
         user_prompt = await questionary.text("Enter your analysis prompt:").ask_async()
         if not user_prompt:
             return
 
         if self.disable_tools:
-            analysis = self.analyze_with_ollama(system_prompt, user_prompt=user_prompt)
             console.print("\n[bold cyan]📊 Analysis Results:[/]\n")
-            console.print(analysis)
+            await self.analyze_with_ollama(system_prompt, user_prompt=user_prompt)
             return
 
         need_commits = self._needs_commit_info(user_prompt)
         need_repo_info = self._needs_repo_info(user_prompt)
         context_dict = {}
 
+        # Connect from this task: gather runs the tool calls in child tasks,
+        # and the transport must be closed by the task that opened it
+        if need_commits or need_repo_info:
+            await self.connect()
+
+        # Issue the tool calls concurrently; the session multiplexes them
+        tasks = []
         if need_commits:
             console.print("[bold green]🔄 Using commit analysis tools...[/]")
-            commits = await self.get_commits(owner, repo)
-            if commits:
-                context_dict["commits"] = commits
+            tasks.append(("commits", self.get_commits(owner, repo)))
         if need_repo_info:
             console.print("[bold green]📊 Using repository analysis tools...[/]")
-            repo_info = await self.get_repo_info(owner, repo)
-            if repo_info:
-                context_dict["repo"] = repo_info
+            tasks.append(("repo", self.get_repo_info(owner, repo)))
 
-        context = json.dumps(context_dict, indent=2)
-        analysis = self.analyze_with_ollama(system_prompt, context, user_prompt)
+        results = await asyncio.gather(*(task for _, task in tasks))
+        for (key, _), result in zip(tasks, results, strict=True):
+            if result:
+                context_dict[key] = result
+
+        context = orjson.dumps(context_dict).decode()
         console.print("\n[bold cyan]📊 Custom Analysis Results:[/]\n")
-        console.print(analysis)
+        await self.analyze_with_ollama(system_prompt, context, user_prompt)
 
     async def get_menu_choice(self) -> str:
         """Get user's menu choice."""
-        choices = {
-            "commits": "🔄 Analyze recent commits",
-            "repo": "📊 Analyze repository information",
-            "custom": "🔍 Custom analysis prompt",
-            "exit": "👋 Exit",
-        }
-
-        style = questionary.Style(
-            [
-                ("qmark", "fg:ansigreen bold"),
-                ("question", "bold"),
-                ("answer", "fg:ansiblue bold"),
-                ("pointer", "fg:ansiyellow bold"),
-                ("highlighted", "fg:ansiyellow bold"),
-                ("selected", "fg:ansigreen"),
-            ]
-        )
-
         choice = await questionary.select(
             "Select an analysis option:",
-            choices=list(choices.values()),
-            style=style,
+            choices=list(MENU_CHOICES.values()),
+            style=MENU_STYLE,
         ).ask_async()
 
-        return next(k for k, v in choices.items() if v == choice) if choice else "exit"
+        return _MENU_KEYS.get(choice, "exit")
 
     async def start(self, owner: str, repo: str) -> None:
         """Start the client."""
         console.print(f"\n[bold green]🔍 Analyzing repository:[/] {owner}/{repo}\n")
 
+        # Warm up Ollama while the user picks an option
+        self.start_warm_up(owner, repo)
+
         while True:
             choice = await self.get_menu_choice()
 
@@ -303,6 +535,8 @@ class GitHubAnalysisClient:
                 await self.handle_commit_analysis(owner, repo)
             elif choice == "repo":
                 await self.handle_repo_analysis(owner, repo)
+            elif choice == "all":
+                await self.handle_all_analysis(owner, repo)
             elif choice == "custom":
                 await self.handle_custom_analysis(owner, repo)
             else:
@@ -322,14 +556,23 @@ async def main() -> None:
         action="store_true",
         help="Disable MCP tools and use Ollama directly",
     )
+    parser.add_argument(
+        "--out-of-process",
+        action="store_true",
+        help="Run the MCP server as a child process over stdio",
+    )
     args = parser.parse_args()
 
-    client = GitHubAnalysisClient(disable_tools=args.disable_tools)
+    client = GitHubAnalysisClient(
+        disable_tools=args.disable_tools, out_of_process=args.out_of_process
+    )
     try:
+        # Load the model while the MCP server starts
+        client.start_warm_up(args.owner, args.repo)
         await client.connect_to_server()
         await client.start(args.owner, args.repo)
     finally:
-        await client.exit_stack.aclose()
+        await client.disconnect()
 
 
 if __name__ == "__main__":
@@ -2,9 +2,16 @@
 
 import asyncio
 import sys
+from collections.abc import Callable
 
-from github_analysis.client.client import main as client_main
-from github_analysis.server.server import main as server_main
+
+def _client_loop_factory() -> Callable[[], asyncio.AbstractEventLoop] | None:
+    """Return uvloop's event loop factory if it is installed."""
+    try:
+        import uvloop
+    except ImportError:
+        return None
+    return uvloop.new_event_loop
 
 
 def main() -> None:
@@ -17,10 +24,15 @@ def main() -> None:
     sys.argv.pop(1)  # Remove the mode argument
 
     try:
+        # Import lazily so usage errors don't pay for the MCP and Ollama stacks
         if mode == "server":
+            from github_analysis.server.server import main as server_main
+
             server_main()  # Server's main function handles its own event loop
         elif mode == "client":
-            asyncio.run(client_main())
+            from github_analysis.client.client import main as client_main
+
+            asyncio.run(client_main(), loop_factory=_client_loop_factory())
         else:
             print("Invalid mode. Use 'server' or 'client'.")
             sys.exit(1)
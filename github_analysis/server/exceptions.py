@@ -4,4 +4,18 @@
 class GitHubAPIError(Exception):
     """Custom exception for GitHub API errors."""
 
-    pass
+    def __init__(
+        self, message: str, status: int | None = None, reason: str | None = None
+    ) -> None:
+        """Keep the parts of the error; the text is only built when shown."""
+        super().__init__(message, status, reason)
+        self.message = message
+        self.status = status
+        self.reason = reason
+
+    def __str__(self) -> str:
+        """Join the message with the HTTP status and reason, if any."""
+        detail = " ".join(
+            str(part) for part in (self.status, self.reason) if part is not None
+        )
+        return f"{self.message}: {detail}" if detail else self.message
@@ -1,65 +1,334 @@
 """Server module for GitHub repository analysis."""
 
+import asyncio
+import functools
 import os
-from typing import Any
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator, Mapping
+from contextlib import asynccontextmanager, contextmanager
+from itertools import islice
+from types import MappingProxyType
+from typing import Any, NamedTuple
 
-import requests
+import anyio
+import httpx
+import orjson
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
 from mcp.server.fastmcp import FastMCP
+from mcp.types import JSONRPCMessage
 from rich.console import Console
+from rich.errors import LiveError
 
 from github_analysis.server.exceptions import GitHubAPIError
 
 # Create console for stderr output
 console = Console(stderr=True)
 
+
+def _default_headers() -> Mapping[str, str]:
+    """Build the GitHub request headers from the environment."""
+    headers = {"Accept": "application/vnd.github.v3+json"}
+    if token := os.getenv("GITHUB_TOKEN"):
+        headers["Authorization"] = f"token {token}"
+    return MappingProxyType(headers)
+
+
+# Base URL of the GitHub REST API
+GITHUB_API = "https://api.github.com"
+
+# Headers sent with every GitHub request, read once at import
+_HEADERS = _default_headers()
+
+# Shared GitHub HTTP client, created on first use so TLS sessions are reused
+_client: httpx.AsyncClient | None = None
+
+# Retry policy for connection failures and transient gateway errors
+RETRIES = 3
+RETRY_BACKOFF = 0.3
+RETRY_STATUSES = frozenset({502, 503, 504})
+
+
+class _CachedResponse(NamedTuple):
+    """A decoded GitHub response kept for reuse and revalidation."""
+
+    fetched_at: float
+    etag: str | None
+    data: Any
+    next_url: str | None
+
+
+# Responses by URL, least recently used first. Entries younger than CACHE_TTL
+# seconds are served without a request; older ones are revalidated by ETag.
+CACHE_SIZE = 512
+CACHE_TTL = 60
+_response_cache: OrderedDict[str, _CachedResponse] = OrderedDict()
+
+# GitHub returns at most this many items per page of a list endpoint
+MAX_PER_PAGE = 100
+
+# Epoch time at which an exhausted GitHub rate limit resets
+_rate_limit_reset = 0.0
+
+# Repository fields passed on to the client; the rest of the REST payload is
+# mostly API URL templates that only cost bandwidth and prompt tokens
+REPO_FIELDS = (
+    "full_name",
+    "description",
+    "homepage",
+    "html_url",
+    "language",
+    "topics",
+    "default_branch",
+    "size",
+    "stargazers_count",
+    "subscribers_count",
+    "forks_count",
+    "open_issues_count",
+    "archived",
+    "fork",
+    "created_at",
+    "updated_at",
+    "pushed_at",
+)
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the pooled GitHub HTTP client, creating it if needed."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            headers=_HEADERS,
+            timeout=httpx.Timeout(15.0, connect=3.05),
+            # No custom transport: httpx only picks up proxies from the
+            # environment (HTTPS_PROXY, NO_PROXY, ...) when it builds its own
+            limits=httpx.Limits(
+                max_connections=20,
+                max_keepalive_connections=10,
+                keepalive_expiry=60,
+            ),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the pooled GitHub HTTP client if it was opened."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _track_rate_limit(response: httpx.Response) -> None:
+    """Remember when the rate limit resets once GitHub reports it exhausted."""
+    global _rate_limit_reset
+    if response.headers.get("X-RateLimit-Remaining") == "0":
+        _rate_limit_reset = float(response.headers.get("X-RateLimit-Reset", "0"))
+
+
+def _decode(response: httpx.Response) -> Any:
+    """Decode a JSON response body straight from bytes."""
+    return orjson.loads(response.content)
+
+
+async def _get(
+    url: str,
+    params: dict[str, Any] | None = None,
+    headers: dict[str, str] | None = None,
+) -> httpx.Response:
+    """GET a URL, retrying failed connections and transient gateway errors."""
+    attempt = 0
+    while True:
+        try:
+            response = await _get_client().get(url, params=params, headers=headers)
+        except (httpx.ConnectError, httpx.ConnectTimeout):
+            if attempt == RETRIES:
+                raise
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt == RETRIES:
+                return response
+        await anyio.sleep(RETRY_BACKOFF * 2**attempt)
+        attempt += 1
+
+
+async def _get_page(
+    url: str, error: str, params: dict[str, Any] | None = None
+) -> tuple[Any, str | None]:
+    """GET a GitHub API URL through the response cache.
+
+    Returns the decoded body and the URL of the next page, if any. Fresh
+    cache entries are returned without a request. Stale ones are revalidated
+    with their ETag: GitHub does not count 304 Not Modified replies against
+    the rate limit, so an unchanged resource costs a few hundred bytes and no
+    quota. While the quota is exhausted, cached bodies are served as is.
+    """
+    # Merge rather than pass params to URL(), which would drop the query of
+    # next-page links and make every later page share one cache entry
+    key = str(httpx.URL(url).copy_merge_params(params or {}))
+    cached = _response_cache.get(key)
+    if cached is not None:
+        _response_cache.move_to_end(key)
+        if time.monotonic() - cached.fetched_at < CACHE_TTL:
+            return cached.data, cached.next_url
+
+    if time.time() < _rate_limit_reset:
+        if cached is not None:
+            return cached.data, cached.next_url
+        raise GitHubAPIError(error, reason="API rate limit exceeded")
+
+    headers = {"If-None-Match": cached.etag} if cached and cached.etag else None
+    response = await _get(url, params, headers)
+    _track_rate_limit(response)
+
+    if response.status_code == 304 and cached is not None:
+        _response_cache[key] = cached._replace(fetched_at=time.monotonic())
+        return cached.data, cached.next_url
+    if response.status_code != 200:
+        # The body may be an HTML error page, so report the status line instead
+        raise GitHubAPIError(error, response.status_code, response.reason_phrase)
+
+    data = _decode(response)
+    next_url = response.links.get("next", {}).get("url")
+    _response_cache[key] = _CachedResponse(
+        time.monotonic(), response.headers.get("ETag"), data, next_url
+    )
+    if len(_response_cache) > CACHE_SIZE:
+        _response_cache.popitem(last=False)
+    return data, next_url
+
+
+async def _gh_get(path: str, error: str, params: dict[str, Any] | None = None) -> Any:
+    """GET a single GitHub API resource by path and return its decoded body."""
+    data, _ = await _get_page(f"{GITHUB_API}{path}", error, params)
+    return data
+
+
+def _project_repo(repo_info: dict[str, Any]) -> dict[str, Any]:
+    """Keep the repository fields listed in REPO_FIELDS, plus owner and license."""
+    projected = {field: repo_info.get(field) for field in REPO_FIELDS}
+    projected["owner"] = (repo_info.get("owner") or {}).get("login")
+    projected["license"] = (repo_info.get("license") or {}).get("spdx_id")
+    return projected
+
+
+def _project_commit(commit: dict[str, Any]) -> dict[str, Any]:
+    """Keep a commit's SHA, author, date and message."""
+    details = commit.get("commit") or {}
+    author = details.get("author") or {}
+    return {
+        "sha": commit.get("sha"),
+        "author": author.get("name"),
+        "date": author.get("date"),
+        "message": details.get("message"),
+    }
+
+
+@asynccontextmanager
+async def lifespan(_: FastMCP) -> AsyncIterator[None]:
+    """Release pooled connections when the server shuts down."""
+    try:
+        yield
+    finally:
+        # An in-process server is stopped by cancellation; finish closing anyway
+        with anyio.CancelScope(shield=True):
+            await close_client()
+
+
 # Create FastMCP instance with proper configuration
 mcp = FastMCP(
     "GitHub Analysis",
     description="GitHub repository analysis tools",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 
-@mcp.tool()
-def get_repo_info(owner: str, repo: str) -> dict[str, Any]:
-    """Fetch repository information from GitHub API."""
-    with console.status("[bold green]Fetching repository info...", spinner="dots"):
-        headers = {"Accept": "application/vnd.github.v3+json"}
-        token = os.getenv("GITHUB_TOKEN")
-        if token:
-            headers["Authorization"] = f"token {token}"
+@contextmanager
+def _status(message: str) -> Iterator[None]:
+    """Show a spinner on stderr unless a concurrent tool call already shows one.
+
+    Nothing is shown when stderr is not a terminal, as under pytest or when
+    the server's stderr is piped, so no refresh thread is started there.
+    """
+    if not console.is_terminal:
+        yield
+        return
+
+    status = console.status(message, spinner="dots")
+    try:
+        status.start()
+    except LiveError:
+        yield
+        return
+
+    try:
+        yield
+    finally:
+        status.stop()
 
-        url = f"https://api.github.com/repos/{owner}/{repo}"
-        response = requests.get(url, headers=headers)
-        if response.status_code != 200:
-            raise GitHubAPIError(
-                f"Failed to fetch repo info: {response.json().get('message')}"
-            )
 
-        read_me_url = f"https://raw.githubusercontent.com/{owner}/{repo}/refs/heads/main/README.md"
-        read_me_raw = requests.get(read_me_url).text
+def _tool[**P, R](
+    status: str,
+) -> Callable[[Callable[P, Awaitable[R]]], Callable[P, Awaitable[R]]]:
+    """Register a GitHub tool that shows a status spinner while it runs."""
 
-        combined_response = response.json()
-        combined_response["readme"] = read_me_raw
-        return combined_response
+    def decorator(fn: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+        # wraps() keeps the signature and docstring FastMCP builds the tool from
+        @functools.wraps(fn)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            with _status(status):
+                return await fn(*args, **kwargs)
 
+        mcp.tool()(wrapper)
+        return wrapper
+
+    return decorator
+
+
+@_tool("[bold green]Fetching repository info...")
+async def get_repo_info(owner: str, repo: str) -> dict[str, Any]:
+    """Fetch repository information from GitHub API."""
+    read_me_url = (
+        f"https://raw.githubusercontent.com/{owner}/{repo}/refs/heads/main/README.md"
+    )
 
-@mcp.tool()
-def get_commit_history(owner: str, repo: str, limit: int = 5) -> list[dict[str, Any]]:
+    # The metadata and README are independent, so fetch them together
+    repo_info, read_me = await asyncio.gather(
+        _gh_get(f"/repos/{owner}/{repo}", "Failed to fetch repo info"),
+        _get(read_me_url),
+    )
+
+    return {**_project_repo(repo_info), "readme": read_me.text}
+
+
+@_tool("[bold green]Fetching commit history...")
+async def get_commit_history(
+    owner: str, repo: str, limit: int = 5
+) -> list[dict[str, Any]]:
     """Fetch commit history from GitHub API."""
-    with console.status("[bold green]Fetching commit history...", spinner="dots"):
-        headers = {"Accept": "application/vnd.github.v3+json"}
-        token = os.getenv("GITHUB_TOKEN")
-        if token:
-            headers["Authorization"] = f"token {token}"
-
-        url = f"https://api.github.com/repos/{owner}/{repo}/commits"
-        response = requests.get(url, headers=headers, params={"per_page": limit})
-        if response.status_code != 200:
-            raise GitHubAPIError(
-                f"Failed to fetch commit history: {response.json().get('message')}"
-            )
-        return response.json()
+    url: str | None = f"{GITHUB_API}/repos/{owner}/{repo}/commits"
+    params: dict[str, Any] | None = {"per_page": min(limit, MAX_PER_PAGE)}
+    commits: list[dict[str, Any]] = []
+
+    # Follow the Link header until enough commits are collected
+    while url and len(commits) < limit:
+        page, url = await _get_page(url, "Failed to fetch commit history", params)
+        if not page:
+            break
+        # Project only as many commits as are still wanted from each page
+        commits.extend(map(_project_commit, islice(page, limit - len(commits))))
+        params = None  # The next-page URL already carries the query
+
+    return commits
+
+
+async def serve(
+    read_stream: MemoryObjectReceiveStream[JSONRPCMessage | Exception],
+    write_stream: MemoryObjectSendStream[JSONRPCMessage],
+) -> None:
+    """Serve MCP requests over in-memory streams in the current event loop."""
+    server = mcp._mcp_server
+    await server.run(read_stream, write_stream, server.create_initialization_options())
 
 
 def main() -> None:
@@ -1,22 +1,98 @@
 import asyncio
-from unittest.mock import patch
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterator
+from unittest.mock import AsyncMock, patch
 
+import httpx
+import orjson
 import pytest
+import pytest_asyncio
+import respx
+from mcp.types import CallToolResult, TextContent
 
+from github_analysis.client import client as client_module
 from github_analysis.client.client import GitHubAnalysisClient
+from github_analysis.server import server
+from github_analysis.server.exceptions import GitHubAPIError
 
 owner = "frangkli"
 repo = "github-analysis"
 
+custom_prompts = [
+    "Who is the author of this repo?",
+    "Tell me about this repo concisely.",
+    "How does this repo use the MCP protocol?",
+    "How is this repository structured?",
+    "What programming language does this codebase use?",
+    "What is the most recent commit about?",
+    "Who authored the latest commit and when?",
+    "How is the weather today?",
+    "What license is this repository using?",
+    "Give me the exact description of this repository.",
+]
+
+# Canned GitHub and Ollama responses for a repository that only exists here
+mock_owner = "octocat"
+mock_repo = "hello-world"
+mock_repo_info = {
+    "full_name": f"{mock_owner}/{mock_repo}",
+    "description": "My first repository on GitHub!",
+    "language": "Python",
+    "owner": {"login": mock_owner},
+    "license": {"spdx_id": "MIT"},
+}
+mock_commits = [
+    {
+        "sha": "7fd1a60b01f91b314f59955a4e4d4e80d8edf11d",
+        "commit": {
+            "author": {"name": "The Octocat", "date": "2012-03-06T23:06:50Z"},
+            "message": "Merge pull request #6 from Spaceghost/patch-1",
+        },
+    }
+]
+mock_readme = "# Hello World"
+mock_analysis = "This is a sample repository."
+
+
+async def _connected(
+    client: GitHubAnalysisClient,
+) -> AsyncIterator[GitHubAnalysisClient]:
+    """Keep a client connected from a task of its own until the generator ends.
+
+    pytest-asyncio tears fixtures down in a different task than it set them up
+    in, but the MCP session's task groups must be exited by the task that
+    entered them.
+    """
+    connected = asyncio.Event()
+    release = asyncio.Event()
+
+    async def hold() -> None:
+        try:
+            await client.connect_to_server()
+        finally:
+            connected.set()
+        await release.wait()
+        await client.disconnect()
+
+    task = asyncio.create_task(hold())
+    await connected.wait()
+    if task.done():
+        task.result()  # Re-raise the connection error
+    yield client
+    release.set()
+    await task
+
 
 class TestMessageContextProcessor:
-    @pytest.fixture(scope="session", autouse=True)
-    def client(self):
-        return GitHubAnalysisClient()
+    @pytest_asyncio.fixture(scope="session")
+    async def client(self) -> AsyncIterator[GitHubAnalysisClient]:
+        async for client in _connected(GitHubAnalysisClient()):
+            yield client
 
-    @pytest.fixture(scope="session", autouse=True)
-    def no_tool_client(self):
-        return GitHubAnalysisClient(disable_tools=True)
+    @pytest_asyncio.fixture(scope="session")
+    async def no_tool_client(self) -> AsyncIterator[GitHubAnalysisClient]:
+        async for client in _connected(GitHubAnalysisClient(disable_tools=True)):
+            yield client
 
     @pytest.mark.parametrize(
         "prompt,expected",
@@ -42,24 +118,82 @@ class TestMessageContextProcessor:
     def test_needs_repo_info(self, client: GitHubAnalysisClient, prompt, expected):
         assert client._needs_repo_info(prompt) == expected
 
-    @pytest.mark.asyncio
-    @pytest.mark.parametrize(
-        "user_prompt",
-        [
-            "Who is the author of this repo?",
-            "Tell me about this repo concisely.",
-            "How does this repo use the MCP protocol?",
-            "How is this repository structured?",
-            "What programming language does this codebase use?",
-            "What is the most recent commit about?",
-            "Who authored the latest commit and when?",
-            "How is the weather today?",
-            "What license is this repository using?",
-            "Give me the exact description of this repository.",
-        ],
-    )
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_cached_failure_keeps_no_lock(self):
+        client = GitHubAnalysisClient()
+        key = ("get_repo_info", mock_owner, "missing")
+        assert await client._cached(key, 60, AsyncMock(return_value=None)) is None
+        assert key not in client._cache
+        assert key not in client._cache_locks
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_get_commits_returns_every_commit(self, client: GitHubAnalysisClient):
+        # FastMCP sends each element of a list result as its own content item
+        commits = [{"sha": "a"}, {"sha": "b"}]
+        result = CallToolResult(
+            content=[
+                TextContent(type="text", text=orjson.dumps(commit).decode())
+                for commit in commits
+            ]
+        )
+        with patch.object(client.session, "call_tool", return_value=result):
+            assert await client.get_commits("octocat", "two-commits", 2) == commits
+
+    @pytest.fixture
+    def mock_api(self) -> Iterator[respx.MockRouter]:
+        repo_url = f"https://api.github.com/repos/{mock_owner}/{mock_repo}"
+        readme_url = f"https://raw.githubusercontent.com/{mock_owner}/{mock_repo}/refs/heads/main/README.md"
+        chunks = [
+            {"message": {"role": "assistant", "content": f"{word} "}, "done": False}
+            for word in mock_analysis.split()
+        ]
+        stream = b"\n".join(orjson.dumps(chunk) for chunk in chunks)
+
+        with respx.mock(assert_all_called=False) as router:
+            router.get(repo_url).respond(json=mock_repo_info)
+            router.get(f"{repo_url}/commits").respond(json=mock_commits)
+            router.get(readme_url).respond(text=mock_readme)
+            router.post(path="/api/chat", name="chat").respond(content=stream)
+            yield router
+
+    @pytest.mark.asyncio(loop_scope="session")
+    @pytest.mark.parametrize("user_prompt", custom_prompts)
     @patch("questionary.text")
     async def test_handle_custom_analysis(
+        self,
+        mock_questionary,
+        client: GitHubAnalysisClient,
+        no_tool_client: GitHubAnalysisClient,
+        mock_api: respx.MockRouter,
+        user_prompt: str,
+    ):
+        # Mock the questionary prompt
+        mock_questionary.return_value.ask_async = AsyncMock(return_value=user_prompt)
+
+        # The tool results requested by the prompt are passed as context
+        await client.handle_custom_analysis(mock_owner, mock_repo)
+        messages = orjson.loads(mock_api["chat"].calls.last.request.content)["messages"]
+        assert messages[-1] == {"role": "user", "content": user_prompt}
+        context = orjson.loads(messages[1]["content"])
+        if client._needs_commit_info(user_prompt):
+            assert context["commits"][0]["sha"] == mock_commits[0]["sha"]
+        else:
+            assert "commits" not in context
+        if client._needs_repo_info(user_prompt):
+            assert context["repo"]["readme"] == mock_readme
+        else:
+            assert "repo" not in context
+
+        # Without tools only the system and user prompts are sent
+        await no_tool_client.handle_custom_analysis(mock_owner, mock_repo)
+        messages = orjson.loads(mock_api["chat"].calls.last.request.content)["messages"]
+        assert [message["role"] for message in messages] == ["system", "user"]
+
+    @pytest.mark.integration
+    @pytest.mark.asyncio(loop_scope="session")
+    @pytest.mark.parametrize("user_prompt", custom_prompts)
+    @patch("questionary.text")
+    async def test_handle_custom_analysis_live(
         self,
         mock_questionary,
         client: GitHubAnalysisClient,
@@ -70,13 +204,8 @@ class TestMessageContextProcessor:
         print("------------------------------------------------")
         print(f"Query: {user_prompt}")
         print("------------------------------------------------")
-        # Connect clients to MCP server
-        await client.connect_to_server()
-        await no_tool_client.connect_to_server()
-
         # Mock the questionary prompt
-        mock_questionary.return_value.ask_async.return_value = asyncio.Future()
-        mock_questionary.return_value.ask_async.return_value.set_result(user_prompt)
+        mock_questionary.return_value.ask_async = AsyncMock(return_value=user_prompt)
 
         # Call the function and get real ollama response
         print("------------------------------------------------")
@@ -86,3 +215,126 @@ class TestMessageContextProcessor:
         print("Client with tools disabled:")
         await no_tool_client.handle_custom_analysis(owner, repo)
         print("------------------------------------------------")
+
+
+class TestGitHubServer:
+    commits_url = f"https://api.github.com/repos/{mock_owner}/{mock_repo}/commits"
+
+    @pytest.fixture(autouse=True)
+    def fresh_server(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        # Each test starts with an empty cache, a full quota and no retry delay
+        monkeypatch.setattr(server, "_response_cache", OrderedDict())
+        monkeypatch.setattr(server, "_rate_limit_reset", 0.0)
+        monkeypatch.setattr(server, "RETRY_BACKOFF", 0)
+
+    @staticmethod
+    def commits_page(request: httpx.Request) -> httpx.Response:
+        # Every page links to the next one, so only the limit ends the walk
+        page = int(request.url.params.get("page", "1"))
+        next_url = f"{TestGitHubServer.commits_url}?per_page=100&page={page + 1}"
+        commits = [
+            {"sha": f"{page}-{i}", "commit": mock_commits[0]["commit"]}
+            for i in range(100)
+        ]
+        return httpx.Response(
+            200, json=commits, headers={"Link": f'<{next_url}>; rel="next"'}
+        )
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_commit_history_follows_pages(self):
+        with respx.mock as router:
+            route = router.get(self.commits_url).mock(side_effect=self.commits_page)
+            commits = await server.get_commit_history(mock_owner, mock_repo, 250)
+
+        shas = [commit["sha"] for commit in commits]
+        assert len(set(shas)) == len(shas) == 250
+        assert shas[0] == "1-0"
+        assert shas[-1] == "3-49"
+        assert route.call_count == 3
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_response_cache(self, monkeypatch: pytest.MonkeyPatch):
+        url = f"/repos/{mock_owner}/{mock_repo}"
+        with respx.mock as router:
+            route = router.get(f"https://api.github.com{url}").mock(
+                side_effect=[
+                    httpx.Response(200, json=mock_repo_info, headers={"ETag": '"v1"'}),
+                    httpx.Response(304),
+                ]
+            )
+
+            # A fresh entry is served without a request
+            assert await server._gh_get(url, "error") == mock_repo_info
+            assert await server._gh_get(url, "error") == mock_repo_info
+            assert route.call_count == 1
+
+            # A stale entry is revalidated with its ETag
+            monkeypatch.setattr(server, "CACHE_TTL", 0)
+            assert await server._gh_get(url, "error") == mock_repo_info
+            assert route.call_count == 2
+            assert route.calls.last.request.headers["If-None-Match"] == '"v1"'
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_retries_transient_errors(self):
+        with respx.mock as router:
+            route = router.get(self.commits_url).mock(
+                side_effect=[
+                    httpx.ConnectError("Connection refused"),
+                    httpx.Response(503),
+                    self.commits_page,
+                ]
+            )
+            commits = await server.get_commit_history(mock_owner, mock_repo, 5)
+
+        assert [commit["sha"] for commit in commits] == [f"1-{i}" for i in range(5)]
+        assert route.call_count == 3
+
+    def test_client_uses_env_proxy(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setenv("HTTPS_PROXY", "http://proxy.example:3128")
+        monkeypatch.setattr(server, "_client", None)
+
+        client = server._get_client()
+        transport = client._transport_for_url(httpx.URL(server.GITHUB_API))
+        assert transport is not client._transport
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_error_status(self):
+        repo_url = f"https://api.github.com/repos/{mock_owner}/{mock_repo}"
+        with respx.mock(assert_all_called=False) as router:
+            router.get(repo_url).respond(404, text="<html>Not Found</html>")
+            router.get(host="raw.githubusercontent.com").respond(404)
+            with pytest.raises(
+                GitHubAPIError, match="^Failed to fetch repo info: 404 Not Found$"
+            ):
+                await server.get_repo_info(mock_owner, mock_repo)
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_client_reports_tool_error(self):
+        repo_url = f"https://api.github.com/repos/{mock_owner}/{mock_repo}"
+        client = GitHubAnalysisClient()
+        try:
+            with (
+                respx.mock(assert_all_called=False) as router,
+                patch.object(client_module.console, "print") as mock_print,
+            ):
+                router.get(repo_url).respond(404)
+                router.get(host="raw.githubusercontent.com").respond(404)
+                assert await client.get_repo_info(mock_owner, mock_repo) is None
+        finally:
+            await client.disconnect()
+
+        message = str(mock_print.call_args.args[0])
+        assert "Failed to fetch repo info: 404 Not Found" in message
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_rate_limit_fails_fast(self):
+        headers = {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "9999999999"}
+        with respx.mock as router:
+            route = router.get(self.commits_url).respond(403, headers=headers)
+            with pytest.raises(GitHubAPIError, match="403 Forbidden"):
+                await server.get_commit_history(mock_owner, mock_repo, 5)
+
+            # Until the reset time, uncached requests fail without reaching GitHub
+            with pytest.raises(GitHubAPIError, match="API rate limit exceeded"):
+                await server.get_commit_history(mock_owner, mock_repo, 10)
+            assert route.call_count == 1